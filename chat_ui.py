@@ -7,7 +7,9 @@ from __future__ import annotations
 
 from pathlib import Path
 import json
-import uuid
+import queue
+import threading
+import time
 
 import requests
 import streamlit as st
@@ -29,6 +31,8 @@ HEADERS = {
     "Accept": "application/vnd.pterodactyl.v1+json",
 }
 SERVER_FILE = Path("server_ids.json")
+HISTORY_WINDOW = 20          # messages rendered before "show earlier" paging
+POLL_SECONDS = 0.25          # how often the script checks the agent's queue
 
 
 @st.cache_data(show_spinner=False, ttl=60 * 10)
@@ -82,67 +86,145 @@ def server_picker():
 if not st.session_state.selected_uuids:
     server_picker()
 
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def list_jars(directory: str, mtime_ns: int) -> list[str]:
+    """Directory listing, cached until the folder's mtime changes."""
+    return sorted(p.name for p in Path(directory).glob("*.jar"))
+
+
+def start_agent_run(prompt: str) -> dict:
+    """
+    Run the agent on a worker thread.  The worker only touches its own queue;
+    the script thread drains it into session state, so reruns never stop it.
+    Only the script run holding `owner` may read the queue (see drain loop).
+    """
+    events: queue.Queue = queue.Queue()
+
+    def work() -> None:
+        try:
+            for event in run_agent_stream(prompt):
+                events.put(event)
+        except Exception as ex:
+            events.put(("final", f"Agent failed: {ex}"))
+
+    thread = threading.Thread(target=work, name="agent-run", daemon=True)
+    thread.start()
+    return {
+        "events": events,
+        "steps": [],
+        "started": time.monotonic(),
+        "thread": thread,
+        "lock": threading.Lock(),
+        "owner": None,
+    }
+
+
+def render_message(msg: dict) -> None:
+    with st.chat_message(msg["role"]):
+        if msg.get("steps"):
+            with st.expander(f"🪵 Agent steps ({len(msg['steps'])})", expanded=False):
+                for step in msg["steps"]:
+                    st.markdown(step, unsafe_allow_html=True)
+        st.markdown(msg["content"])
+
+
+with st.sidebar:
+    st.markdown("## ⚙️  Settings")
+    if st.button("Edit allowed servers"):
+        server_picker()
+
 uploader = st.file_uploader(
     "Upload plugin JAR(s)",
     type=["jar"],
     accept_multiple_files=True,
     help="Each file is saved to downloads/.",
 )
+if "saved_uploads" not in st.session_state:
+    st.session_state.saved_uploads = set()
+
 if uploader:
     for f in uploader:
+        if f.file_id in st.session_state.saved_uploads:
+            continue
         dest: Path = DOWNLOADS_DIR / f.name
         dest.write_bytes(f.getbuffer())
+        st.session_state.saved_uploads.add(f.file_id)
         st.success(f"Saved **{f.name}** → downloads/")
 
 with st.expander("📂 downloads/", expanded=False):
-    files = [p.name for p in DOWNLOADS_DIR.glob("*.jar")]
+    files = list_jars(str(DOWNLOADS_DIR), DOWNLOADS_DIR.stat().st_mtime_ns)
     st.markdown("\n".join(f"* {n}" for n in files) or "_empty_")
 
 if "history" not in st.session_state:
     st.session_state.history = []
 
-if "current_steps_idx" not in st.session_state:
-    st.session_state.current_steps_idx = None
+if "history_window" not in st.session_state:
+    st.session_state.history_window = HISTORY_WINDOW
 
-for msg in st.session_state.history:
-    with st.chat_message(msg["role"]):
-        st.markdown(msg["content"])
+if "active_run" not in st.session_state:
+    st.session_state.active_run = None
+
+history = st.session_state.history
+hidden = max(0, len(history) - st.session_state.history_window)
+if hidden:
+    if st.button(f"⬆️ Show earlier messages ({hidden} hidden)"):
+        st.session_state.history_window += HISTORY_WINDOW
+        st.rerun()
+
+for msg in history[hidden:]:
+    render_message(msg)
 
-prompt = st.chat_input("Ask the agent …")
+run = st.session_state.active_run
+prompt = st.chat_input("Ask the agent …", disabled=run is not None)
 if prompt:
-    st.session_state.history.append({"role": "user", "content": prompt})
+    history.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
-
-    run_id = str(uuid.uuid4())
-    st.session_state[f"{run_id}_steps"] = []
-
-    assistant_container = st.chat_message("assistant")
-    with assistant_container:
-        with st.expander("🪵 Agent steps", expanded=True):
-            steps_placeholder = st.empty()
-        reply_placeholder = st.empty()
-
-    for kind, content in run_agent_stream(prompt):
-        if kind == "step":
-            st.session_state[f"{run_id}_steps"].append(content)
-            steps_md = "\n".join(st.session_state[f"{run_id}_steps"])
-            steps_placeholder.markdown(steps_md, unsafe_allow_html=True)
-
-            if (
-                not st.session_state.history
-                or not st.session_state.history[-1]["content"].startswith("🪵 Agent steps")
-            ):
-                st.session_state.history.append(
-                    {"role": "assistant", "content": steps_md}
-                )
-            else:
-                st.session_state.history[-1]["content"] = steps_md
-        else:
-            reply_placeholder.markdown(content)
-            st.session_state.history.append({"role": "assistant", "content": content})
-
-with st.sidebar:
-    st.markdown("## ⚙️  Settings")
-    if st.button("Edit allowed servers"):
-        server_picker()
\ No newline at end of file
+    run = st.session_state.active_run = start_agent_run(prompt)
+
+if run is not None:
+    # With fast reruns the previous script thread may still be in this loop;
+    # claiming ownership under the lock makes it stop before its next read.
+    token = object()
+    with run["lock"]:
+        run["owner"] = token
+        seen = list(run["steps"])
+
+    with st.chat_message("assistant"):
+        steps_box = st.expander("🪵 Agent steps", expanded=True)
+        for step in seen:
+            steps_box.markdown(step, unsafe_allow_html=True)
+        status = st.empty()
+        shown_seconds = None
+
+        while True:
+            with run["lock"]:
+                if run["owner"] is not token:
+                    st.stop()
+                try:
+                    kind, content = run["events"].get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    kind = None
+                    if not run["thread"].is_alive() and run["events"].empty():
+                        kind, content = "final", "Agent stopped without a reply."
+                else:
+                    if kind == "step":
+                        run["steps"].append(content)
+
+            if kind is None:
+                # Updating an element also lets Streamlit interrupt us for a
+                # rerun; the worker keeps going and the next run resumes here.
+                seconds = int(time.monotonic() - run["started"])
+                if seconds != shown_seconds:
+                    status.caption(f"⏳ Working… {seconds}s")
+                    shown_seconds = seconds
+                continue
+
+            if kind == "step":
+                steps_box.markdown(content, unsafe_allow_html=True)
+                continue
+
+            history.append({"role": "assistant", "content": content, "steps": run["steps"]})
+            st.session_state.active_run = None
+            st.rerun()
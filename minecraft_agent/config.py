@@ -20,6 +20,13 @@ OPENAI_TEMP:       float = float(os.getenv("OPENAI_TEMPERATURE", "0"))
 DOWNLOADS_DIR = Path(__file__).resolve().parent.parent / "downloads"
 DOWNLOADS_DIR.mkdir(exist_ok=True)
 
+BACKUPS_DIR = Path(os.getenv("BACKUPS_DIR", DOWNLOADS_DIR.parent / "backups"))
+BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
+BACKUP_SEGMENTS:   int = max(1, int(os.getenv("BACKUP_SEGMENTS",   "8")))
+BACKUP_PARALLEL_PULLS: int = max(1, int(os.getenv("BACKUP_PARALLEL_PULLS", "2")))
+BACKUP_KEEP_LAST:  int = int(os.getenv("BACKUP_KEEP_LAST",  "5"))
+BACKUP_KEEP_DAILY: int = int(os.getenv("BACKUP_KEEP_DAILY", "7"))
+
 if Path("server_ids.json").exists():
     with open("server_ids.json", "r") as f:
         server_ids = json.load(f)
@@ -29,6 +29,7 @@ _SYSTEM_PROMPT = (
     "When running a command, remove the / from the command. "
     "If you need to run another command, use the custom api docs tool. "
     "If you need to upload a file, use the upload file tool."
+    " To copy a finished backup to this machine, use the pull backup tool instead of the download endpoint. "
     "Make sure to search for the file in the downloads folder first to make sure you have the file the user wants, then upload it."
     "If the file or similar file is not in the downloads folder, ask the user to upload it."
     f"These are the api docs: {apidocs}"
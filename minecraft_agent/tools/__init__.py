@@ -8,6 +8,7 @@ from .web_tool import SafeWebDownloadTool
 from .wait_tool import WaitTool
 from .custom_api_tool import CustomAPITool
 from .upload_file_tool import UploadFileTool
+from .pull_backup_tool import PullBackupTool
 
 
 def all_tools() -> List:
@@ -17,4 +18,5 @@ def all_tools() -> List:
         WaitTool(),
         CustomAPITool(),
         UploadFileTool(),
+        PullBackupTool(),
         ]
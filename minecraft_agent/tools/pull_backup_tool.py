@@ -0,0 +1,308 @@
+"""
+PullBackupTool
+──────────────
+Copies finished panel backups to the local backups/ store.
+
+For every requested backup the tool
+1. reads the backup details (size + checksum) and resolves the signed URL
+   via `/api/client/servers/{id}/backups/{uuid}/download`,
+2. downloads it with parallel HTTP range segments into a `.part` file,
+   falling back to a single stream when the node ignores `Range`.
+   Wings tokens are single-use, so every request gets a fresh signed URL
+   and the probe response itself is kept when it is the full body,
+3. verifies size and checksum, then atomically renames the file into
+   backups/<server_id>/,
+4. prunes that server's folder (keep-last-N + keep-one-per-day for N days,
+   both from config – never a file pulled in the same call).
+
+Several backups (e.g. one per server) are pulled concurrently, at most
+BACKUP_PARALLEL_PULLS at a time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pydantic as py
+import requests
+
+from ..config import (
+    ALLOWED_SERVER_IDS,
+    BACKUP_KEEP_DAILY,
+    BACKUP_KEEP_LAST,
+    BACKUP_PARALLEL_PULLS,
+    BACKUP_SEGMENTS,
+    BACKUPS_DIR,
+    PELICAN_API_KEY,
+    PELICAN_BASE_URL,
+)
+from ..utils.logging import get_logger
+
+log = get_logger("PullBackupTool")
+
+_CHUNK = 1 << 20                 # 1 MiB read size
+_MIN_SEGMENT = 16 << 20          # don't split below 16 MiB per segment
+_STAMP_FMT = "%Y%m%dT%H%M%SZ"
+_SEGMENT_ATTEMPTS = 3            # tries per range before the pull fails
+
+
+class BackupRef(py.BaseModel):
+    server_id: str = py.Field(description="UUID of the server that owns the backup.")
+    backup_uuid: uuid.UUID = py.Field(description="UUID of a completed backup.")
+
+
+class PullBackupArgs(py.BaseModel):
+    backups: List[BackupRef] = py.Field(
+        description="Backups to pull; several entries are downloaded concurrently.",
+        min_length=1,
+    )
+
+
+class PullBackupTool:
+    NAME = "pull_backup"
+    DESC = (
+        "Download one or more completed panel backups into the local backups/ "
+        "folder (parallel ranged download, checksum-verified) and apply the "
+        "local retention policy. Use custom_api_call to create/list backups first."
+    )
+
+    def function_spec(self) -> Dict[str, Any]:
+        schema = PullBackupArgs.model_json_schema()
+        schema["additionalProperties"] = False
+        return {"name": self.NAME, "description": self.DESC, "parameters": schema}
+
+    def __call__(self, *args):
+        if not PELICAN_API_KEY:
+            return "Client API token not configured (PELICAN_API_KEY env var)."
+
+        arguments = args[-1]
+        try:
+            data = PullBackupArgs(**arguments)
+        except Exception as exc:
+            return f"Validation error: {exc}"
+
+        denied = [b.server_id for b in data.backups if b.server_id not in ALLOWED_SERVER_IDS]
+        if denied:
+            return f"Access denied: You do not have permission to access {', '.join(denied)}."
+
+        # Two workers on the same backup would share one .part file.
+        refs = list({(b.server_id, b.backup_uuid): b for b in data.backups}.values())
+
+        with ThreadPoolExecutor(max_workers=min(len(refs), BACKUP_PARALLEL_PULLS)) as pool:
+            outcomes = list(pool.map(self._pull_one, refs))
+        results = [msg for msg, _ in outcomes]
+        pulled = {path for _, path in outcomes if path is not None}
+
+        for server_id in {r.server_id for r in refs}:
+            removed = _apply_retention(
+                BACKUPS_DIR / server_id, BACKUP_KEEP_LAST, BACKUP_KEEP_DAILY, protect=pulled
+            )
+            if removed:
+                results.append(f"Retention removed {len(removed)} old backup(s) for `{server_id}`.")
+
+        return "\n".join(results)
+
+    # ── single backup ──────────────────────────────────────────────
+    def _pull_one(self, ref: BackupRef) -> Tuple[str, Optional[Path]]:
+        try:
+            return _pull(ref)
+        except requests.RequestException as ex:
+            # str(ex) may contain the signed URL and its token – keep it out.
+            status = getattr(ex.response, "status_code", None)
+            log.warning("Backup pull failed for %s: %s", ref.backup_uuid, type(ex).__name__)
+            reason = f"HTTP {status}" if status else type(ex).__name__
+            return f"Backup {ref.backup_uuid} failed: {reason}", None
+        except Exception as ex:
+            log.exception("Backup pull failed for %s", ref.backup_uuid)
+            return f"Backup {ref.backup_uuid} failed: {ex}", None
+
+
+def _api_get(path: str) -> Dict[str, Any]:
+    headers = {
+        "Authorization": f"Bearer {PELICAN_API_KEY}",
+        "Accept": "application/vnd.pterodactyl.v1+json",
+    }
+    resp = requests.get(PELICAN_BASE_URL.rstrip("/") + path, headers=headers, timeout=60)
+    if resp.status_code >= 400:
+        raise RuntimeError(f"HTTP {resp.status_code}: {resp.text}")
+    return resp.json()
+
+
+def _pull(ref: BackupRef) -> Tuple[str, Optional[Path]]:
+    """Return (message, local path) – the path is None if nothing was stored."""
+    base = f"/api/client/servers/{ref.server_id}/backups/{ref.backup_uuid}"
+    info = _api_get(base)["attributes"]
+    if not info.get("completed_at"):
+        return f"Backup {ref.backup_uuid} has not finished yet.", None
+    if info.get("is_successful") is False:
+        return f"Backup {ref.backup_uuid} failed on panel.", None
+
+    dest_dir = BACKUPS_DIR / ref.server_id
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    # Match on the UUID only: the stamp falls back to "now" without created_at.
+    existing = sorted(dest_dir.glob(f"*_{ref.backup_uuid}.tar.gz"))
+    if existing:
+        return f"{existing[-1].name} already present.", existing[-1]
+    dest = dest_dir / f"{_stamp(info.get('created_at'))}_{ref.backup_uuid}.tar.gz"
+
+    def signed_url() -> str:
+        return _api_get(base + "/download")["attributes"]["url"]
+
+    tmp = dest_dir / f".{dest.name}.part"
+    try:
+        with requests.get(
+            signed_url(), headers={"Range": "bytes=0-0"}, stream=True, timeout=60
+        ) as probe:
+            probe.raise_for_status()
+            size = _total_size(probe)
+            # Panel reports 0 bytes for some nodes – fall back to the HTTP length.
+            expected: Optional[int] = info.get("bytes") or size
+            ranged = probe.status_code == 206
+            if not ranged:
+                log.info("Pulling %s as a single stream", ref.backup_uuid)
+                _write_body(probe, tmp)
+
+        if ranged and size:
+            log.info("Pulling %s (%d bytes) in ranged segments", ref.backup_uuid, size)
+            _download_ranged(signed_url, tmp, size)
+        elif ranged:
+            # 206 without a usable total – fetch the whole body once more.
+            with requests.get(signed_url(), stream=True, timeout=60) as r:
+                r.raise_for_status()
+                _write_body(r, tmp)
+
+        got = tmp.stat().st_size
+        if expected and got != expected:
+            raise RuntimeError(f"size mismatch: expected {expected} bytes, got {got}")
+        _verify_checksum(tmp, info.get("checksum"))
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    return f"Pulled **{dest.name}** ({got / (1 << 20):.1f} MiB) → backups/{ref.server_id}/", dest
+
+
+# ── transfer helpers ───────────────────────────────────────────────
+def _total_size(r: requests.Response) -> Optional[int]:
+    """Full object size from a 206 Content-Range or a 200 Content-Length."""
+    if r.status_code == 206:
+        total = r.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+    else:
+        total = r.headers.get("Content-Length", "")
+    return int(total) if total.isdigit() else None
+
+
+def _write_body(r: requests.Response, tmp: Path) -> None:
+    with open(tmp, "wb") as f:
+        for chunk in r.iter_content(chunk_size=_CHUNK):
+            f.write(chunk)
+
+
+def _spans(size: int, segments: int) -> List[Tuple[int, int]]:
+    """Inclusive byte ranges covering [0, size) in at most `segments` parts."""
+    segments = max(1, min(segments, size // _MIN_SEGMENT))
+    step = -(-size // segments)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+
+
+def _download_ranged(signed_url: Callable[[], str], tmp: Path, size: int) -> None:
+    """
+    Fetch the `_spans` of [0, size) concurrently into `tmp`.  Each request
+    uses a fresh URL from `signed_url()`; a failed span is retried
+    `_SEGMENT_ATTEMPTS` times before the whole pull fails.
+    """
+    spans = _spans(size, BACKUP_SEGMENTS)
+
+    with open(tmp, "wb") as f:
+        f.truncate(size)
+
+    def fetch_once(start: int, end: int) -> None:
+        headers = {"Range": f"bytes={start}-{end}"}
+        with requests.get(signed_url(), headers=headers, stream=True, timeout=60) as r:
+            if r.status_code != 206:
+                raise RuntimeError(f"range {start}-{end} returned HTTP {r.status_code}")
+            with open(tmp, "r+b") as f:
+                f.seek(start)
+                written = 0
+                for chunk in r.iter_content(chunk_size=_CHUNK):
+                    f.write(chunk)
+                    written += len(chunk)
+        if written != end - start + 1:
+            raise RuntimeError(f"range {start}-{end} truncated at {written} bytes")
+
+    def fetch(span: Tuple[int, int]) -> None:
+        for attempt in range(1, _SEGMENT_ATTEMPTS + 1):
+            try:
+                return fetch_once(*span)
+            except (requests.RequestException, RuntimeError) as ex:
+                if attempt == _SEGMENT_ATTEMPTS:
+                    raise
+                log.warning("Range %d-%d attempt %d failed: %s", *span, attempt, type(ex).__name__)
+
+    with ThreadPoolExecutor(max_workers=len(spans)) as pool:
+        list(pool.map(fetch, spans))
+
+
+def _verify_checksum(path: Path, checksum: Optional[str]) -> None:
+    """Panel checksums look like 'sha1:<hex>'; skip if absent or unknown."""
+    if not checksum or ":" not in checksum:
+        return
+    algo, want = checksum.split(":", 1)
+    try:
+        h = hashlib.new(algo)
+    except ValueError:
+        log.warning("Unknown checksum algorithm %s – skipping verification", algo)
+        return
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    if h.hexdigest().lower() != want.lower():
+        raise RuntimeError(f"{algo} checksum mismatch")
+
+
+# ── retention ──────────────────────────────────────────────────────
+def _stamp(created_at: Optional[str]) -> str:
+    try:
+        dt = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+    except ValueError:
+        dt = datetime.now(timezone.utc)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).strftime(_STAMP_FMT)
+
+
+def _apply_retention(
+    folder: Path, keep_last: int, keep_daily: int, protect: Iterable[Path] = ()
+) -> List[Path]:
+    """
+    Delete local backups not covered by any rule:
+    ▪ the `keep_last` newest files (at least one)
+    ▪ the newest file of each of the `keep_daily` most recent days
+    ▪ anything in `protect` (e.g. files pulled in this call)
+    File names start with a UTC timestamp, so name order == age order.
+    """
+    if not folder.is_dir():
+        return []
+    files = sorted((p for p in folder.glob("*.tar.gz") if p.is_file()), reverse=True)
+
+    keep = set(files[:max(1, keep_last)]) | set(protect)
+    days: set[str] = set()
+    for p in files:
+        day = p.name[:8]
+        if day not in days:
+            if len(days) >= keep_daily:
+                break
+            days.add(day)
+            keep.add(p)
+
+    removed = [p for p in files if p not in keep]
+    for p in removed:
+        log.info("Retention: removing %s", p)
+        p.unlink(missing_ok=True)
+    return removed
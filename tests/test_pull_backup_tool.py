@@ -0,0 +1,228 @@
+import hashlib
+import itertools
+
+import pytest
+import requests
+
+from minecraft_agent.tools import pull_backup_tool as pbt
+from minecraft_agent.tools.pull_backup_tool import (
+    _MIN_SEGMENT,
+    BackupRef,
+    _apply_retention,
+    _spans,
+    _verify_checksum,
+)
+
+SERVER = "srv-1"
+BACKUP = "0b5c2b5e-6a3c-4f59-9a4e-1c2d3e4f5a6b"
+DATA = bytes(range(256)) * 40  # 10 KiB
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} for url: ?token=secret", response=self)
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class FakeWings:
+    """Serves DATA from single-use signed URLs, optionally honouring Range."""
+
+    def __init__(self, ranged=True, truncate=0):
+        self.ranged = ranged
+        self.truncate = truncate  # number of range responses to cut short
+        self.tokens = itertools.count()
+        self.used = set()
+        self.ranges = []
+
+    def signed_url(self):
+        return f"https://node/download/backup?token={next(self.tokens)}"
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        if url in self.used:
+            return FakeResponse(401)
+        self.used.add(url)
+        rng = (headers or {}).get("Range")
+        if not (self.ranged and rng):
+            return FakeResponse(200, DATA, {"Content-Length": str(len(DATA))})
+        start, end = (int(x) for x in rng.split("=")[1].split("-"))
+        self.ranges.append((start, end))
+        body = DATA[start:end + 1]
+        if self.truncate and end > 0:
+            self.truncate -= 1
+            body = body[:-1]
+        return FakeResponse(206, body, {"Content-Range": f"bytes {start}-{end}/{len(DATA)}"})
+
+
+@pytest.fixture
+def wings(monkeypatch, tmp_path):
+    server = FakeWings()
+    info = {
+        "completed_at": "2024-01-02T03:04:05+00:00",
+        "created_at": "2024-01-02T03:00:00+00:00",
+        "is_successful": True,
+        "bytes": len(DATA),
+        "checksum": "sha1:" + hashlib.sha1(DATA).hexdigest(),
+    }
+
+    def api_get(path):
+        if path.endswith("/download"):
+            return {"attributes": {"url": server.signed_url()}}
+        return {"attributes": info}
+
+    monkeypatch.setattr(pbt, "_api_get", api_get)
+    monkeypatch.setattr(pbt.requests, "get", server.get)
+    monkeypatch.setattr(pbt, "BACKUPS_DIR", tmp_path)
+    monkeypatch.setattr(pbt, "_MIN_SEGMENT", 1024)
+    monkeypatch.setattr(pbt, "BACKUP_SEGMENTS", 4)
+    server.info = info
+    return server
+
+
+def _pull(server_id=SERVER):
+    return pbt.PullBackupTool()._pull_one(BackupRef(server_id=server_id, backup_uuid=BACKUP))
+
+
+def _touch(folder, *names):
+    paths = [folder / n for n in names]
+    for p in paths:
+        p.write_bytes(b"x")
+    return paths
+
+
+def test_retention_keeps_last_and_one_per_day(tmp_path):
+    _touch(
+        tmp_path,
+        "20240103T120000Z_c.tar.gz",
+        "20240103T060000Z_b.tar.gz",
+        "20240102T120000Z_a.tar.gz",
+        "20240101T120000Z_z.tar.gz",
+    )
+    removed = _apply_retention(tmp_path, keep_last=1, keep_daily=2)
+
+    assert sorted(p.name for p in removed) == [
+        "20240101T120000Z_z.tar.gz",
+        "20240103T060000Z_b.tar.gz",
+    ]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "20240102T120000Z_a.tar.gz",
+        "20240103T120000Z_c.tar.gz",
+    ]
+
+
+def test_retention_never_deletes_everything_or_protected(tmp_path):
+    newest, older = _touch(tmp_path, "20240102T000000Z_n.tar.gz", "20240101T000000Z_o.tar.gz")
+    _apply_retention(tmp_path, keep_last=0, keep_daily=0, protect={older})
+
+    assert newest.exists() and older.exists()
+
+
+@pytest.mark.parametrize(
+    "size, segments",
+    [(_MIN_SEGMENT * 3 + 7, 8), (_MIN_SEGMENT * 5 - 1, 4), (_MIN_SEGMENT - 1, 8), (1, 8)],
+)
+def test_spans_cover_size_without_gaps(size, segments):
+    spans = _spans(size, segments)
+
+    assert 1 <= len(spans) <= segments
+    assert spans[0][0] == 0 and spans[-1][1] == size - 1
+    for (_, end), (start, _) in zip(spans, spans[1:]):
+        assert start == end + 1
+
+
+def test_verify_checksum(tmp_path):
+    f = tmp_path / "b.tar.gz"
+    f.write_bytes(b"backup")
+    good = hashlib.sha1(b"backup").hexdigest()
+
+    _verify_checksum(f, f"sha1:{good}")
+    _verify_checksum(f, None)
+    with pytest.raises(RuntimeError, match="checksum mismatch"):
+        _verify_checksum(f, "sha1:" + "0" * 40)
+
+
+def test_pull_ranged_uses_fresh_url_per_segment(wings, tmp_path):
+    msg, path = _pull()
+
+    assert msg.startswith("Pulled"), msg
+    assert path.read_bytes() == DATA
+    assert len(wings.ranges) == 1 + 4  # probe + segments
+    assert not list((tmp_path / SERVER).glob(".*.part"))
+
+
+def test_pull_falls_back_to_probe_body_on_200(wings):
+    wings.ranged = False
+    msg, path = _pull()
+
+    assert msg.startswith("Pulled"), msg
+    assert path.read_bytes() == DATA
+    assert len(wings.used) == 1  # the probe response itself was the download
+
+
+def test_pull_retries_truncated_segment(wings):
+    wings.truncate = 1
+    msg, path = _pull()
+
+    assert msg.startswith("Pulled"), msg
+    assert path.read_bytes() == DATA
+
+
+def test_pull_fails_when_segment_keeps_truncating(wings, tmp_path):
+    wings.truncate = 100
+    msg, path = _pull()
+
+    assert path is None and "truncated" in msg
+    assert not list((tmp_path / SERVER).iterdir())
+
+
+def test_pull_size_mismatch(wings):
+    wings.info["bytes"] = len(DATA) + 1
+    msg, path = _pull()
+
+    assert path is None and "size mismatch" in msg
+
+
+def test_pull_hides_signed_url_on_http_error(wings, monkeypatch):
+    monkeypatch.setattr(pbt.requests, "get", lambda *a, **kw: FakeResponse(403))
+    msg, path = _pull()
+
+    assert path is None and msg.endswith("HTTP 403") and "token" not in msg
+
+
+@pytest.mark.parametrize(
+    "update, expected",
+    [({"completed_at": None}, "has not finished yet"), ({"is_successful": False}, "failed on panel")],
+)
+def test_pull_early_returns(wings, update, expected):
+    wings.info.update(update)
+    msg, path = _pull()
+
+    assert path is None and expected in msg and not wings.used
+
+
+def test_pull_skips_backup_already_present(wings, tmp_path):
+    first, _ = _pull()
+    wings.info["created_at"] = None  # stamp would differ on a second pull
+    msg, path = _pull()
+
+    assert first.startswith("Pulled") and "already present" in msg
+    assert len(list((tmp_path / SERVER).glob("*.tar.gz"))) == 1
+
+
+def test_backup_uuid_rejects_paths():
+    with pytest.raises(Exception):
+        BackupRef(server_id=SERVER, backup_uuid="../../etc")